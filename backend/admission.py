@@ -0,0 +1,163 @@
+import math
+import os
+import threading
+import time
+
+from flask import g, request
+
+from encoding import respond
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue for one route class.
+
+    The limit adapts to observed latency (AIMD): it grows by roughly one slot per
+    limit's worth of fast completions that ran at the limit, and shrinks by 10% when
+    the latency average exceeds the target, so a degraded upstream gets fewer
+    concurrent requests. Light traffic never raises the limit it did not use.
+    """
+
+    def __init__(self, name, limit, max_limit, queue_size, queue_timeout, target_latency, min_limit=1):
+        self.name = name
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+
+        self.active = 0
+        self.waiting = 0
+        self.latency_ewma = None
+        self.rejected = 0
+        self.timed_out = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Take a slot; returns None when admitted, else 'queue_full' or 'timeout'"""
+        with self._cond:
+            if self.waiting == 0 and self.active < int(self.limit):
+                self.active += 1
+                return None
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return 'queue_full'
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        return 'timeout'
+                    self._cond.wait(remaining)
+                self.active += 1
+                return None
+            finally:
+                self.waiting -= 1
+
+    def release(self, latency):
+        """Free a slot and feed the request latency into the adaptive limit"""
+        with self._cond:
+            previous_limit = int(self.limit)
+            saturated = self.active >= previous_limit
+            self.active -= 1
+            self._adapt(latency, saturated)
+            if int(self.limit) > previous_limit:
+                self._cond.notify_all()
+            else:
+                self._cond.notify()
+
+    def _adapt(self, latency, saturated):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+        now = time.monotonic()
+        if self.latency_ewma > self.target_latency:
+            # Decrease at most once per target latency window
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def retry_after(self):
+        """Seconds a rejected client should wait: time to drain the queue ahead of it"""
+        latency = self.latency_ewma or self.target_latency
+        return max(1, math.ceil(latency * (self.waiting + 1) / max(1, int(self.limit))))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "active": self.active,
+                "waiting": self.waiting,
+                "latency_ewma_ms": round((self.latency_ewma or 0) * 1000, 1),
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+def _env(name, key, default, cast):
+    return cast(os.getenv(f"ADMISSION_{name.upper()}_{key}", default))
+
+
+def controller_from_env(name, limit, max_limit, queue_size, queue_timeout, target_latency):
+    """Build a controller, letting ADMISSION_<NAME>_<SETTING> override the defaults"""
+    return AdmissionController(
+        name,
+        limit=_env(name, "LIMIT", limit, int),
+        max_limit=_env(name, "MAX_LIMIT", max_limit, int),
+        queue_size=_env(name, "QUEUE_SIZE", queue_size, int),
+        queue_timeout=_env(name, "QUEUE_TIMEOUT", queue_timeout, float),
+        target_latency=_env(name, "TARGET_LATENCY", target_latency, float),
+    )
+
+
+def install_admission(app, controllers, routes):
+    """Gate requests by path prefix; routes is a list of (prefix, controller name)"""
+
+    def route_class(path):
+        for prefix, name in routes:
+            if path == prefix or path.startswith(prefix + '/'):
+                return controllers[name]
+        return None
+
+    @app.before_request
+    def admit():
+        controller = route_class(request.path)
+        if controller is None:
+            return None
+
+        outcome = controller.acquire()
+        if outcome is None:
+            g.admission = (controller, time.monotonic())
+            return None
+
+        # Full queue: client is sending too much; queue deadline: server is saturated
+        status = 429 if outcome == 'queue_full' else 503
+        response = respond({"error": f"Server busy ({controller.name}), please retry later"}, status)
+        response.headers['Retry-After'] = str(controller.retry_after())
+        return response
+
+    @app.after_request
+    def release_on_close(response):
+        admission = g.pop('admission', None)
+        if admission is not None:
+            controller, start = admission
+            # Hold the slot until the body has been sent: a streamed response
+            # (/api/export) is generated after the request context is gone
+            response.call_on_close(lambda: controller.release(time.monotonic() - start))
+        return response
+
+    @app.teardown_request
+    def release(exc=None):
+        # Only reached with a slot still held when no response was finalized
+        admission = g.pop('admission', None)
+        if admission is not None:
+            controller, start = admission
+            controller.release(time.monotonic() - start)
@@ -1,18 +1,31 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request
 import numpy as np
 import tensorflow as tf
 import json
 import os
 from datetime import datetime
 import threading
+import queue
+import atexit
 import warnings
 # Import chatbot blueprint
 from chatBot import chat_bp as chat_app
 # Import database service
 from database import DatabaseService
+# Import columnar export
+import export
+# Import request validation and response encoding
+from validation import validate_prediction_input
+from encoding import read_payload, respond
+# Import feature attribution
+from explain import METHODS, Explainer
+# Import admission control
+from admission import controller_from_env, install_admission
+# Import in-memory static asset layer
+from static_assets import StaticAssets
 
-# Initialize Flask app with static folder pointing to React build
-app = Flask(__name__, static_folder='../frontend/dist', static_url_path='')
+# Initialize Flask app; the React build is served by the in-memory static layer
+app = Flask(__name__, static_folder=None)
 
 # Suppress TensorFlow warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
@@ -22,6 +35,7 @@ warnings.filterwarnings('ignore', category=UserWarning, module='keras')
 MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'model')
 FEATURE_INFO_FILE = os.path.join(MODEL_DIR, 'feature_info.json')
 USER_DATA_FILE = os.path.join(os.path.dirname(__file__), 'user_data.json')
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist')
 
 # Load feature info
 with open(FEATURE_INFO_FILE, 'r') as f:
@@ -36,33 +50,95 @@ for name in ['savings', 'amount', 'multi_task']:
     models[name] = tf.keras.models.load_model(
         os.path.join(MODEL_DIR, f'trained_model/best_{name}_model.keras'), compile=False)
 
+# Scan the React build once; assets are served from memory
+static_assets = StaticAssets(os.path.normpath(STATIC_DIR))
+
+# Feature attributions for the savings and risk heads, cached by feature vector
+explainer = Explainer(models, FEATURE_ORDER, steps=int(os.getenv("EXPLAIN_STEPS", "32")))
+MAX_EXPLAIN_BATCH = 1000
+
+# Admission control: separate concurrency limits and queues per route class, so slow
+# Gemini calls, storage writes or attribution batches cannot starve inference
+admission_controllers = {
+    "inference": controller_from_env("inference", limit=8, max_limit=32, queue_size=64,
+                                     queue_timeout=2.0, target_latency=0.25),
+    # Up to MAX_EXPLAIN_BATCH rows x (steps + 1) x 2 heads of gradients per request
+    "explain": controller_from_env("explain", limit=2, max_limit=4, queue_size=16,
+                                   queue_timeout=5.0, target_latency=2.0),
+    "chat": controller_from_env("chat", limit=4, max_limit=16, queue_size=16,
+                                queue_timeout=5.0, target_latency=5.0),
+    "data": controller_from_env("data", limit=4, max_limit=16, queue_size=32,
+                                queue_timeout=3.0, target_latency=1.0),
+}
+install_admission(app, admission_controllers, [
+    ('/api/predict', 'inference'),
+    ('/api/explain', 'explain'),
+    ('/api/chat', 'chat'),
+    ('/api/data', 'data'),
+    ('/api/export', 'data'),
+])
+
 # Thread lock for file operations
 file_lock = threading.Lock()
 
+# Predictions are persisted by a background writer, so storage latency never counts
+# against the inference slots; the bounded queue caps memory if storage falls behind
+SAVE_QUEUE_SIZE = int(os.getenv("SAVE_QUEUE_SIZE", "1024"))
+SAVE_BATCH_SIZE = 100
+save_queue = queue.Queue(maxsize=SAVE_QUEUE_SIZE)
+
 def save_user_data(input_data, output_data):
-    """Save user input and output to Supabase database"""
+    """Queue user input and output for the background database writer"""
+    prediction_data = {
+        "timestamp": datetime.now().isoformat(),
+        "input": input_data,
+        "output": output_data
+    }
     try:
-        prediction_data = {
-            "timestamp": datetime.now().isoformat(),
-            "input": input_data,
-            "output": output_data
-        }
-        
-        # Save to Supabase
-        result = DatabaseService.create_prediction(prediction_data)
-        
-        if result:
-            print(f"Data saved to Supabase successfully with ID: {result.get('id')}")
-        else:
-            print("Failed to save data to Supabase")
-            # Fallback to JSON file if Supabase fails
-            save_user_data_json(input_data, output_data)
-            
-    except Exception as e:
-        print(f"Error saving to Supabase: {e}")
-        # Fallback to JSON file if Supabase fails
+        save_queue.put_nowait(prediction_data)
+    except queue.Full:
+        print("Save queue full, writing prediction to JSON fallback")
         save_user_data_json(input_data, output_data)
 
+def write_predictions(batch):
+    """Insert a batch of queued predictions, falling back to JSON on failure"""
+    try:
+        saved = DatabaseService.create_predictions(batch)
+        if saved:
+            print(f"Saved {len(saved)} prediction(s) to the database")
+            return
+        print("Failed to save data to the database")
+    except Exception as e:
+        print(f"Error saving to the database: {e}")
+    # Fallback to JSON file (keeps the latest prediction, as before)
+    save_user_data_json(batch[-1]["input"], batch[-1]["output"])
+
+def drain_save_queue(block=True):
+    """Take up to SAVE_BATCH_SIZE queued predictions"""
+    batch = []
+    try:
+        batch.append(save_queue.get(block=block))
+        while len(batch) < SAVE_BATCH_SIZE:
+            batch.append(save_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+def save_worker():
+    """Background writer: persist queued predictions in batches"""
+    while True:
+        write_predictions(drain_save_queue())
+
+def flush_saves():
+    """Write whatever is still queued when the process exits"""
+    batch = drain_save_queue(block=False)
+    while batch:
+        write_predictions(batch)
+        batch = drain_save_queue(block=False)
+
+threading.Thread(target=save_worker, daemon=True).start()
+atexit.register(flush_saves)
+
 def save_user_data_json(input_data, output_data):
     """Fallback: Save user input and output to JSON file"""
     def _save():
@@ -86,8 +162,8 @@ def save_user_data_json(input_data, output_data):
     # Run in background thread
     threading.Thread(target=_save, daemon=True).start()
 
-def process_features(data):
-    """Process input data into feature vector"""
+def compute_features(data):
+    """Compute the model features (including derived ones) from input data"""
     # Extract and convert all inputs
     base_data = {
         "Income": float(data["Income"]),
@@ -145,12 +221,16 @@ def process_features(data):
         "Savings_Difficulty_nan": 1
     }
     
+    return features
+
+def features_to_array(features):
+    """Order a feature dictionary into the model's input vector"""
     return np.array([features[name] for name in FEATURE_ORDER], dtype=np.float32).reshape(1, -1)
 
 # API Routes
 @app.route('/api/')
 def home():
-    return jsonify({"message": "Savings Prediction API", "features": TOTAL_FEATURES, "status": "running"})
+    return respond({"message": "Savings Prediction API", "features": TOTAL_FEATURES, "status": "running"})
 
 # Register the chat blueprint under /api/chat
 app.register_blueprint(chat_app, url_prefix='/api/chat')
@@ -158,12 +238,18 @@ app.register_blueprint(chat_app, url_prefix='/api/chat')
 @app.route('/api/predict', methods=['POST'])
 def predict():
     try:
-        data = request.get_json()
+        data = read_payload()
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return respond({"error": "No JSON data provided"}, 400)
+        
+        # Validate every field up front and report all errors at once
+        values, errors = validate_prediction_input(data)
+        if errors:
+            return respond({"error": f"Invalid input in {len(errors)} field(s)", "errors": errors}, 400)
         
         # Process features
-        X = process_features(data)
+        features = compute_features(values)
+        X = features_to_array(features)
         
         # Get predictions with suppressed warnings
         with warnings.catch_warnings():
@@ -188,21 +274,84 @@ def predict():
             }
         }
         
-        # Save data in background
-        save_user_data(data, result)
+        # Queue for the background writer, including the derived features the models saw
+        save_user_data({**data, **features}, result)
         
-        return jsonify(result)
+        return respond(result)
         
-    except KeyError as e:
-        return jsonify({"error": f"Missing field: {str(e)}"}), 400
-    except (ValueError, TypeError) as e:
-        return jsonify({"error": f"Invalid data: {str(e)}"}), 400
     except Exception as e:
-        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
+        return respond({"error": f"Prediction failed: {str(e)}"}, 500)
+
+def explain_options(payload):
+    """Read method/top_k options for the explain endpoints"""
+    method = payload.get("method", METHODS[0])
+    if method not in METHODS:
+        raise ValueError(f"method must be one of: {', '.join(METHODS)}")
+    top_k = payload.get("top_k", 5)
+    if isinstance(top_k, bool) or not isinstance(top_k, int):
+        raise ValueError("top_k must be an integer")
+    return method, max(1, top_k)
+
+@app.route('/api/explain', methods=['POST'])
+def explain():
+    """Per-feature attributions for one prediction input"""
+    try:
+        data = read_payload()
+        if not isinstance(data, dict) or not data:
+            return respond({"error": "No JSON data provided"}, 400)
+        
+        values, errors = validate_prediction_input(data.get("input", data))
+        if errors:
+            return respond({"error": f"Invalid input in {len(errors)} field(s)", "errors": errors}, 400)
+        method, top_k = explain_options(data)
+        
+        X = features_to_array(compute_features(values))
+        return respond({"method": method, **explainer.explain(X, method, top_k)[0]})
+        
+    except ValueError as e:
+        return respond({"error": str(e)}, 400)
+    except Exception as e:
+        return respond({"error": f"Explanation failed: {str(e)}"}, 500)
+
+@app.route('/api/explain/batch', methods=['POST'])
+def explain_batch():
+    """Per-feature attributions for many inputs in one batched pass"""
+    try:
+        data = read_payload()
+        inputs = data.get("inputs") if isinstance(data, dict) else None
+        if not isinstance(inputs, list) or not inputs:
+            return respond({"error": "Provide a non-empty 'inputs' list"}, 400)
+        if len(inputs) > MAX_EXPLAIN_BATCH:
+            return respond({"error": f"At most {MAX_EXPLAIN_BATCH} inputs per batch"}, 400)
+        method, top_k = explain_options(data)
+        
+        # Validate everything first so errors come back for all rows at once
+        rows, errors = [], {}
+        for index, item in enumerate(inputs):
+            values, row_errors = validate_prediction_input(item)
+            if row_errors:
+                errors[str(index)] = row_errors
+            else:
+                rows.append(features_to_array(compute_features(values)))
+        if errors:
+            return respond({"error": f"Invalid input in {len(errors)} row(s)", "errors": errors}, 400)
+        
+        explanations = explainer.explain(np.vstack(rows), method, top_k)
+        return respond({"method": method, "count": len(explanations), "explanations": explanations})
+        
+    except ValueError as e:
+        return respond({"error": str(e)}, 400)
+    except Exception as e:
+        return respond({"error": f"Explanation failed: {str(e)}"}, 500)
 
 @app.route('/api/health')
 def health():
-    return jsonify({"status": "healthy", "models": len(models), "features": TOTAL_FEATURES})
+    return respond({
+        "status": "healthy",
+        "models": len(models),
+        "features": TOTAL_FEATURES,
+        "admission": {name: c.stats() for name, c in admission_controllers.items()}
+    })
 
 @app.route('/api/data', methods=['GET'])
 def get_user_data():
@@ -221,7 +370,7 @@ def get_user_data():
                     "output": pred["output_data"]
                 })
             
-            return jsonify({
+            return respond({
                 "total_predictions": len(formatted_predictions),
                 "predictions": formatted_predictions
             })
@@ -230,12 +379,12 @@ def get_user_data():
         if os.path.exists(USER_DATA_FILE):
             with open(USER_DATA_FILE, 'r') as f:
                 data = json.load(f)
-                return jsonify({
+                return respond({
                     "total_predictions": len(data.get("predictions", [])),
                     "predictions": data.get("predictions", [])
                 })
         
-        return jsonify({"total_predictions": 0, "predictions": []})
+        return respond({"total_predictions": 0, "predictions": []})
         
     except Exception as e:
         print(f"Error in get_user_data: {e}")
@@ -244,30 +393,72 @@ def get_user_data():
             if os.path.exists(USER_DATA_FILE):
                 with open(USER_DATA_FILE, 'r') as f:
                     data = json.load(f)
-                    return jsonify({
+                    return respond({
                         "total_predictions": len(data.get("predictions", [])),
                         "predictions": data.get("predictions", [])
                     })
         except Exception as json_error:
             print(f"JSON fallback also failed: {json_error}")
         
-        return jsonify({"error": f"Failed to load data: {str(e)}"}), 500
+        return respond({"error": f"Failed to load data: {str(e)}"}, 500)
+
+@app.route('/api/export', methods=['GET'])
+def export_predictions():
+    """Stream the predictions table as Arrow IPC or Parquet"""
+    if export.pa is None:
+        return respond({"error": "Export requires pyarrow to be installed"}, 501)
+
+    fmt = request.args.get('format', 'arrow').lower()
+    if fmt not in export.EXPORT_FORMATS:
+        return respond({"error": f"Unsupported format: {fmt}"}, 400)
+
+    columns, unknown = export.parse_columns(request.args.get('columns'))
+    if unknown:
+        return respond({"error": f"Unknown columns: {', '.join(unknown)}"}, 400)
+    if not columns:
+        return respond({"error": "columns must name at least one column"}, 400)
+
+    try:
+        page_size = min(int(request.args.get('page_size', export.DEFAULT_PAGE_SIZE)), export.MAX_PAGE_SIZE)
+    except ValueError:
+        return respond({"error": "page_size must be an integer"}, 400)
+
+    # Validate the range before streaming: once the 200 headers are sent, a storage
+    # error can only truncate the file
+    bounds = {}
+    for name in ('start', 'end'):
+        value = request.args.get(name)
+        if value:
+            try:
+                bounds[name] = datetime.fromisoformat(value).isoformat()
+            except ValueError:
+                return respond({"error": f"{name} must be an ISO 8601 timestamp"}, 400)
+
+    pages = DatabaseService.iter_prediction_pages(
+        columns,
+        start=bounds.get('start'),
+        end=bounds.get('end'),
+        user_id=request.args.get('user_id'),
+        page_size=max(1, page_size)
+    )
+    mimetype, filename = export.EXPORT_FORMATS[fmt]
+    return Response(
+        export.stream_export(pages, columns, fmt, DatabaseService.prediction_id_kind()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 # Serve React App
 @app.route('/')
 def serve_react():
     """Serve the main React app"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return static_assets.serve('index.html')
 
 @app.route('/<path:path>')
 def serve_static_or_react(path):
     """Serve static files or React app for client-side routing"""
-    try:
-        # Try to serve static file first
-        return send_from_directory(app.static_folder, path)
-    except:
-        # If file doesn't exist, serve React app (for client-side routing)
-        return send_from_directory(app.static_folder, 'index.html')
+    # Resolved against the in-memory manifest; unknown routes fall back to index.html
+    return static_assets.serve(path)
 
 if __name__ == '__main__':
     app.run(debug=True, threaded=True, port=5000)
\ No newline at end of file
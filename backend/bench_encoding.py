@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark request validation and response encode/decode cost.
+
+Compares the stdlib JSON encoder (what jsonify uses) with the orjson and msgpack
+paths in encoding.py, for a single prediction response and for /api/data history
+pages of increasing size.
+
+Usage:
+    python backend/bench_encoding.py --pages 100 1000 5000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import encoding
+from schema import INPUT_COLUMNS, decode_rows, encode_predictions
+from validation import validate_prediction_input
+
+
+def sample_input(rng):
+    data = {}
+    for column in INPUT_COLUMNS:
+        if column.kind == "str":
+            data[column.key] = rng.choice(["Employed", "Student"]) if column.key == "Occupation" else "Tier_2"
+        elif column.key == "Age":
+            data[column.key] = rng.randint(18, 70)
+        elif column.key == "Dependents":
+            data[column.key] = rng.randint(0, 4)
+        elif column.kind == "int":
+            data[column.key] = rng.randint(0, 1)
+        else:
+            data[column.key] = round(rng.uniform(100, 90000), 2)
+    return data
+
+
+def sample_output(rng):
+    confidence, risk = rng.random(), rng.random()
+    return {
+        "savings_model": {"can_achieve_savings": confidence > 0.5, "confidence": confidence},
+        "amount_model": {"recommended_savings": rng.uniform(0, 20000)},
+        "multi_task_model": {
+            "can_achieve_savings": confidence > 0.5,
+            "savings_confidence": confidence,
+            "recommended_savings_amount": rng.uniform(0, 20000),
+            "financial_risk": risk > 0.5,
+            "risk_score": risk,
+        },
+    }
+
+
+def history_page(rng, size):
+    """A /api/data response body with `size` predictions, built through the schema round trip"""
+    predictions = [
+        {"timestamp": f"2026-01-01T00:00:{i % 60:02d}", "input": sample_input(rng), "output": sample_output(rng)}
+        for i in range(size)
+    ]
+    rows = encode_predictions(predictions)
+    for i, row in enumerate(rows):
+        row["id"] = i + 1
+    decoded = decode_rows(rows)
+    return {
+        "total_predictions": len(decoded),
+        "predictions": [
+            {"timestamp": p["timestamp"], "input": p["input_data"], "output": p["output_data"]}
+            for p in decoded
+        ],
+    }
+
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def codecs():
+    available = [("json (stdlib)", lambda p: json.dumps(p).encode(), json.loads)]
+    if encoding.orjson is not None:
+        available.append(("orjson", encoding.dumps_json, encoding.loads_json))
+    if encoding.msgpack is not None:
+        available.append(("msgpack", encoding.dumps_msgpack, encoding.loads_msgpack))
+    return available
+
+
+def bench_payload(label, payload, repeat):
+    print(f"\n{label}")
+    print(f"  {'codec':<14} {'encode':>12} {'decode':>12} {'size':>12}")
+    for name, dumps, loads in codecs():
+        body = dumps(payload)
+        encode_s = timeit(lambda: dumps(payload), repeat)
+        decode_s = timeit(lambda: loads(body), repeat)
+        print(f"  {name:<14} {encode_s * 1e6:>10.1f}us {decode_s * 1e6:>10.1f}us {len(body):>10,}B")
+
+
+def bench_validation(rng, repeat):
+    data = sample_input(rng)
+    per_call = timeit(lambda: [validate_prediction_input(data) for _ in range(1000)], repeat) / 1000
+    print(f"\nValidation: {per_call * 1e6:.2f}us per request ({len(validate_prediction_input.fields)} fields)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark validation and response encoding")
+    parser.add_argument('--pages', type=int, nargs='+', default=[100, 1000, 5000], help="History page sizes")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bench_validation(rng, args.repeat)
+    bench_payload("Single prediction response", sample_output(rng), args.repeat * 200)
+    for size in args.pages:
+        bench_payload(f"History page: {size} predictions", history_page(rng, size), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
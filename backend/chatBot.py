@@ -1,9 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint
 from google import genai
 import json
 import os
 from dotenv import load_dotenv
 from database import DatabaseService
+from encoding import read_payload, respond
 
 load_dotenv()
 
@@ -82,14 +83,15 @@ chat_bp = Blueprint('chat_bp', __name__)
 @chat_bp.route('/', methods=['POST'])
 def chat():
     try:
-        user_message = request.json.get('message')
+        payload = read_payload()
+        user_message = payload.get('message') if isinstance(payload, dict) else None
         if not user_message:
-            return jsonify({"error": "No message provided"}), 400
+            return respond({"error": "No message provided"}, 400)
 
         latest = get_latest_prediction()
 
         if not latest:
-            return jsonify({
+            return respond({
                 "response": "I don't have any saved financial data yet. Please make a savings prediction first!"
             })
 
@@ -156,9 +158,9 @@ Instructions:
             contents=full_prompt
         )
         
-        return jsonify({"response": response.text})
+        return respond({"response": response.text})
 
     except Exception as e:
         # Log the exception for debugging purposes
         print(f"Error in chat endpoint: {e}")
-        return jsonify({"error": "An internal server error occurred. Please try again later."}), 500
\ No newline at end of file
+        return respond({"error": "An internal server error occurred. Please try again later."}, 500)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import json
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack responses are only offered when installed
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def dumps_json(payload):
+    """Encode to compact JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def loads_json(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_msgpack(payload):
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def loads_msgpack(data):
+    return msgpack.unpackb(data, raw=False)
+
+
+def read_payload():
+    """Decode the request body as msgpack or JSON depending on its Content-Type"""
+    if msgpack is not None and request.mimetype in MSGPACK_MIMETYPES:
+        try:
+            return loads_msgpack(request.get_data())
+        except Exception:
+            return None
+    return request.get_json(silent=True)
+
+
+def negotiate():
+    """Pick the response format from the Accept header; JSON unless msgpack is asked for"""
+    if msgpack is None:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE)
+
+
+def respond(payload, status=200):
+    """Serialize a payload in the negotiated format"""
+    mimetype = negotiate()
+    if mimetype in MSGPACK_MIMETYPES:
+        body = dumps_msgpack(payload)
+    else:
+        body = dumps_json(payload)
+    return Response(body, status=status, mimetype=mimetype, headers={'Vary': 'Accept'})
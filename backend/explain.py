@@ -0,0 +1,156 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import tensorflow as tf
+
+# Heads to explain: name -> (model name, output index for multi-output models)
+EXPLAIN_HEADS = {
+    "savings": ("savings", None),
+    "risk": ("multi_task", 2),
+}
+METHODS = ("integrated_gradients", "gradient_x_input")
+
+
+class AttributionCache:
+    """Thread-safe LRU cache of per-row attributions keyed by feature-vector hash"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+class Explainer:
+    """Per-feature attributions for the savings and risk heads.
+
+    All interpolation steps for all rows of a request are evaluated in one
+    batched forward/backward pass per head.
+    """
+
+    def __init__(self, models, feature_names, steps=32, max_batch=8192, cache_size=4096, baseline=None):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.steps = steps
+        self.max_batch = max_batch
+        self.baseline = np.zeros(self.n_features, dtype=np.float32) if baseline is None \
+            else np.asarray(baseline, dtype=np.float32)
+        self.cache = AttributionCache(cache_size)
+        self._functions = {
+            head: self._build_function(models[model_name], output_index)
+            for head, (model_name, output_index) in EXPLAIN_HEADS.items()
+        }
+
+    def _build_function(self, model, output_index):
+        spec = [
+            tf.TensorSpec([None, self.n_features], tf.float32),
+            tf.TensorSpec([self.n_features], tf.float32),
+            tf.TensorSpec([None], tf.float32),
+        ]
+
+        @tf.function(input_signature=spec)
+        def attribute(x, baseline, alphas):
+            n_rows = tf.shape(x)[0]
+            n_alphas = tf.shape(alphas)[0]
+            # (alphas, rows, features) interpolation flattened into one batch
+            path = baseline + alphas[:, None, None] * (x[None, :, :] - baseline)
+            path = tf.reshape(path, [-1, self.n_features])
+            with tf.GradientTape() as tape:
+                tape.watch(path)
+                outputs = model(path, training=False)
+                if output_index is not None:
+                    outputs = outputs[output_index]
+            grads = tape.gradient(outputs, path)
+            grads = tf.reshape(grads, [n_alphas, n_rows, self.n_features])
+            outputs = tf.reshape(outputs, [n_alphas, n_rows])
+            return grads, outputs
+
+        return attribute
+
+    def _alphas(self, method):
+        if method == "gradient_x_input":
+            return np.array([0.0, 1.0], dtype=np.float32)
+        return np.linspace(0.0, 1.0, self.steps + 1, dtype=np.float32)
+
+    def _attribute(self, head, X, method):
+        """Attributions, predictions and baseline predictions for the rows of X"""
+        alphas = self._alphas(method)
+        rows_per_call = max(1, self.max_batch // len(alphas))
+        attributions, predictions, baselines = [], [], []
+        for start in range(0, len(X), rows_per_call):
+            chunk = X[start:start + rows_per_call]
+            grads, outputs = self._functions[head](chunk, self.baseline, alphas)
+            grads, outputs = grads.numpy(), outputs.numpy()
+            if method == "gradient_x_input":
+                attributions.append(grads[-1] * (chunk - self.baseline))
+            else:
+                # Trapezoidal Riemann sum of the gradients along the path
+                avg_grads = ((grads[:-1] + grads[1:]) / 2).mean(axis=0)
+                attributions.append(avg_grads * (chunk - self.baseline))
+            predictions.append(outputs[-1])
+            baselines.append(outputs[0])
+        return np.concatenate(attributions), np.concatenate(predictions), np.concatenate(baselines)
+
+    def _format(self, attributions, prediction, baseline_prediction):
+        order = np.argsort(-np.abs(attributions))
+        return {
+            "prediction": float(prediction),
+            "baseline_prediction": float(baseline_prediction),
+            "attributions": {name: float(value) for name, value in zip(self.feature_names, attributions)},
+            "top_features": [
+                {"feature": self.feature_names[i], "attribution": float(attributions[i])} for i in order
+            ],
+        }
+
+    def _key(self, row, method):
+        digest = hashlib.sha1(row.tobytes())
+        digest.update(method.encode())
+        digest.update(str(self.steps).encode())
+        return digest.hexdigest()
+
+    def explain(self, X, method="integrated_gradients", top_k=5):
+        """Explain each row of X (n, features); cached rows are not recomputed"""
+        X = np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        keys = [self._key(row, method) for row in X]
+        results = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            X_missing = X[missing]
+            per_head = {head: self._attribute(head, X_missing, method) for head in self._functions}
+            for j, i in enumerate(missing):
+                result = {
+                    head: self._format(attributions[j], predictions[j], baselines[j])
+                    for head, (attributions, predictions, baselines) in per_head.items()
+                }
+                self.cache.put(keys[i], result)
+                results[i] = result
+
+        return [self._trim(result, top_k) for result in results]
+
+    @staticmethod
+    def _trim(result, top_k):
+        return {
+            head: {**explanation, "top_features": explanation["top_features"][:top_k]}
+            for head, explanation in result.items()
+        }
@@ -0,0 +1,93 @@
+from schema import INPUT_COLUMNS, OUTPUT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # export is optional; the endpoint reports it as unavailable
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "predictions.arrows"),
+    "parquet": ("application/vnd.apache.parquet", "predictions.parquet"),
+}
+DEFAULT_PAGE_SIZE = 5000
+MAX_PAGE_SIZE = 50000
+
+
+EXPORT_COLUMNS = ["id", "timestamp", "user_id"] + [c.name for c in INPUT_COLUMNS + OUTPUT_COLUMNS]
+
+
+def arrow_types(id_kind):
+    """Arrow type per export column; the id type is declared by the storage backend"""
+    kinds = {"float": pa.float64(), "int": pa.int64(), "str": pa.string(), "bool": pa.bool_()}
+    types = {"id": kinds[id_kind], "timestamp": pa.string(), "user_id": pa.string()}
+    for column in INPUT_COLUMNS + OUTPUT_COLUMNS:
+        types[column.name] = kinds[column.kind]
+    return types
+
+
+def parse_columns(value):
+    """Validate a comma-separated column projection; returns (columns, unknown)"""
+    if not value:
+        return list(EXPORT_COLUMNS), []
+    columns = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in columns if name not in EXPORT_COLUMNS]
+    return columns, unknown
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_export(pages, columns, fmt, id_kind="int"):
+    """Encode pages of column arrays as an Arrow IPC stream or Parquet file, chunk by chunk"""
+    types = arrow_types(id_kind)
+    schema = pa.schema([(name, types[name]) for name in columns])
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        write = writer.write_table
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+
+    try:
+        for page in pages:
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(page[name], type=types[name]) for name in columns], schema=schema)
+            # One row group per page for Parquet, one record batch per page for Arrow
+            write(pa.Table.from_batches([batch]) if fmt == "parquet" else batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
@@ -0,0 +1,167 @@
+import json
+import os
+
+# Paths
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model')
+FEATURE_INFO_FILE = os.path.join(MODEL_DIR, 'feature_info.json')
+
+# Load feature info
+with open(FEATURE_INFO_FILE, 'r') as f:
+    feature_info = json.load(f)
+
+# Numerical features that are whole numbers rather than amounts
+INT_FEATURES = {"Age", "Dependents"}
+
+# Raw categorical inputs stored next to their one-hot encodings
+RAW_CATEGORICALS = ["Occupation", "City_Tier"]
+
+# Category dropped from each one-hot encoding (drop_first during preprocessing)
+BASELINE_CATEGORIES = {"Occupation": "Employed", "City_Tier": "Tier_1"}
+
+# Numerical features computed by the API from the raw inputs
+DERIVED_FEATURES = {
+    "Savings_Rate", "Actual_Savings_Potential", "Essential_Expenses", "Essential_Expense_Ratio",
+    "Non_Essential_Income", "Expense_Efficiency", "Total_Expenses", "Debt_to_Income_Ratio",
+    "Financial_Stress_Score",
+}
+
+# Model outputs: (column, output group, field, kind)
+OUTPUT_FIELDS = [
+    ("savings_model_can_achieve", "savings_model", "can_achieve_savings", "bool"),
+    ("savings_model_confidence", "savings_model", "confidence", "float"),
+    ("amount_model_recommended_savings", "amount_model", "recommended_savings", "float"),
+    ("multi_task_can_achieve", "multi_task_model", "can_achieve_savings", "bool"),
+    ("multi_task_savings_confidence", "multi_task_model", "savings_confidence", "float"),
+    ("multi_task_recommended_amount", "multi_task_model", "recommended_savings_amount", "float"),
+    ("multi_task_financial_risk", "multi_task_model", "financial_risk", "bool"),
+    ("multi_task_risk_score", "multi_task_model", "risk_score", "float"),
+]
+
+
+def _to_float(value):
+    return 0.0 if value is None else float(value)
+
+
+def _to_int(value):
+    return 0 if value is None else int(value)
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def _to_bool(value):
+    return None if value is None else bool(value)
+
+
+# kind -> (converter, SQL type)
+KINDS = {
+    "float": (_to_float, "REAL"),
+    "int": (_to_int, "INTEGER"),
+    "str": (_to_str, "TEXT"),
+    "bool": (_to_bool, "BOOLEAN"),
+}
+
+
+class Column:
+    """One column of the predictions table and where its value lives in a prediction"""
+
+    __slots__ = ("name", "kind", "source", "key", "group", "convert", "sql_type")
+
+    def __init__(self, name, kind, source, key, group=None):
+        self.name = name
+        self.kind = kind
+        self.source = source  # "input" or "output"
+        self.key = key        # input key, or field inside the output group
+        self.group = group    # output group ("savings_model", ...)
+        self.convert, self.sql_type = KINDS[kind]
+
+
+def build_columns(feature_info):
+    """Generate the input and output columns from feature_info.json plus the model outputs"""
+    input_columns = []
+    for key in feature_info['numerical_features']:
+        input_columns.append(Column(key.lower(), "int" if key in INT_FEATURES else "float", "input", key))
+    for key in RAW_CATEGORICALS:
+        input_columns.append(Column(key.lower(), "str", "input", key))
+    for key in feature_info['categorical_features']:
+        input_columns.append(Column(key.lower(), "int", "input", key))
+
+    output_columns = [
+        Column(name, kind, "output", field, group)
+        for name, group, field, kind in OUTPUT_FIELDS
+    ]
+    return input_columns, output_columns
+
+
+INPUT_COLUMNS, OUTPUT_COLUMNS = build_columns(feature_info)
+META_COLUMNS = [("timestamp", "TEXT NOT NULL"), ("user_id", "TEXT")]
+
+# Every column of the predictions table besides id, in table order
+TABLE_COLUMNS = META_COLUMNS + [(c.name, c.sql_type) for c in INPUT_COLUMNS + OUTPUT_COLUMNS]
+COLUMN_NAMES = [name for name, _ in TABLE_COLUMNS]
+BOOL_COLUMNS = [c.name for c in OUTPUT_COLUMNS if c.kind == "bool"]
+
+# Output groups in response order, with their (field, column) pairs
+OUTPUT_GROUPS = {}
+for _column in OUTPUT_COLUMNS:
+    OUTPUT_GROUPS.setdefault(_column.group, []).append((_column.key, _column.name))
+
+
+def predictions_to_columns(predictions, user_id=None):
+    """Convert predictions ({timestamp, input, output}) to column arrays"""
+    inputs = [p["input"] for p in predictions]
+    outputs = [p["output"] for p in predictions]
+
+    columns = {
+        "timestamp": [p["timestamp"] for p in predictions],
+        "user_id": [p.get("user_id", user_id) for p in predictions],
+    }
+    for column in INPUT_COLUMNS:
+        key, convert = column.key, column.convert
+        columns[column.name] = [convert(data.get(key)) for data in inputs]
+    for column in OUTPUT_COLUMNS:
+        group, key, convert = column.group, column.key, column.convert
+        columns[column.name] = [convert(data.get(group, {}).get(key)) for data in outputs]
+    return columns
+
+
+def columns_to_rows(columns):
+    """Column arrays -> list of row dicts"""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def rows_to_columns(rows, names=None):
+    """List of row dicts -> column arrays"""
+    names = names or (list(rows[0]) if rows else [])
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def columns_to_predictions(columns):
+    """Column arrays -> predictions ({id, timestamp, input_data, output_data})"""
+    input_keys = [c.key for c in INPUT_COLUMNS]
+    inputs = [dict(zip(input_keys, values)) for values in zip(*(columns[c.name] for c in INPUT_COLUMNS))]
+
+    groups = {}
+    for group, pairs in OUTPUT_GROUPS.items():
+        keys = [key for key, _ in pairs]
+        groups[group] = [dict(zip(keys, values)) for values in zip(*(columns[name] for _, name in pairs))]
+    group_names = list(groups)
+    outputs = [dict(zip(group_names, values)) for values in zip(*groups.values())]
+
+    return [
+        {"id": pred_id, "timestamp": timestamp, "input_data": input_data, "output_data": output_data}
+        for pred_id, timestamp, input_data, output_data
+        in zip(columns["id"], columns["timestamp"], inputs, outputs)
+    ]
+
+
+def encode_predictions(predictions, user_id=None):
+    """Predictions -> table rows"""
+    return columns_to_rows(predictions_to_columns(predictions, user_id))
+
+
+def decode_rows(rows):
+    """Table rows -> predictions"""
+    return columns_to_predictions(rows_to_columns(rows, ["id"] + COLUMN_NAMES))
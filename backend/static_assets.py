@@ -0,0 +1,145 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Vite emits content-hashed file names such as assets/index-4f9c2a1b.js
+HASHED_ASSET_RE = re.compile(r'[-.][A-Za-z0-9_-]{8,}\.[a-z0-9]+$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json',
+                      'image/svg+xml', 'application/xml', 'application/manifest+json')
+MIN_COMPRESS_SIZE = 1024
+
+EXTRA_MIMETYPES = {
+    '.js': 'application/javascript',
+    '.mjs': 'application/javascript',
+    '.css': 'text/css',
+    '.svg': 'image/svg+xml',
+    '.json': 'application/json',
+    '.webmanifest': 'application/manifest+json',
+    '.woff': 'font/woff',
+    '.woff2': 'font/woff2',
+}
+
+
+class StaticAsset:
+    """One file of the React build held in memory with its encoded variants"""
+
+    __slots__ = ('path', 'mimetype', 'etag', 'cache_control', 'variants')
+
+    def __init__(self, path, mimetype, etag, cache_control, variants):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants = variants  # encoding ('identity', 'gzip', 'br') -> bytes
+
+
+class StaticAssets:
+    """In-memory manifest of the React build, scanned once at startup"""
+
+    def __init__(self, root, index='index.html'):
+        self.root = root
+        self.index = index
+        self.assets = {}
+        self.scan()
+
+    def scan(self):
+        """Load every file under root, reusing .gz/.br siblings or generating them"""
+        assets = {}
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.endswith(('.gz', '.br')):
+                        continue
+                    full_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                    assets[rel_path] = self._load(full_path, rel_path)
+        self.assets = assets
+        print(f"Static manifest: {len(assets)} file(s) from {self.root}")
+
+    def _load(self, full_path, rel_path):
+        with open(full_path, 'rb') as f:
+            body = f.read()
+
+        ext = os.path.splitext(rel_path)[1].lower()
+        mimetype = EXTRA_MIMETYPES.get(ext) or mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        variants = {'identity': body}
+
+        if mimetype.startswith(COMPRESSIBLE_TYPES) and len(body) >= MIN_COMPRESS_SIZE:
+            gzipped = self._read_sibling(full_path + '.gz')
+            if gzipped is None:
+                gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gzipped) < len(body):
+                variants['gzip'] = gzipped
+
+            compressed = self._read_sibling(full_path + '.br')
+            if compressed is None and brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+            if compressed is not None and len(compressed) < len(body):
+                variants['br'] = compressed
+
+        is_hashed = rel_path.startswith('assets/') and HASHED_ASSET_RE.search(rel_path)
+        return StaticAsset(
+            path=rel_path,
+            mimetype=mimetype,
+            etag=hashlib.sha1(body).hexdigest()[:20],
+            cache_control=IMMUTABLE_CACHE if is_hashed else REVALIDATE_CACHE,
+            variants=variants
+        )
+
+    @staticmethod
+    def _read_sibling(path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def resolve(self, path):
+        """Find the asset for a request path; client-side routes resolve to index.html"""
+        asset = self.assets.get(path)
+        if asset is not None:
+            return asset
+        # Unknown API paths and missing files with an extension are real 404s, not SPA routes
+        if path.startswith('api/') or '.' in path.rsplit('/', 1)[-1]:
+            return None
+        return self.assets.get(self.index)
+
+    def serve(self, path):
+        """Build the response for a path from memory"""
+        asset = self.resolve(path.lstrip('/'))
+        if asset is None:
+            return Response('Not Found', status=404, mimetype='text/plain')
+
+        encoding = self._negotiate(asset)
+        etag = f'{asset.etag}-{encoding}'
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset.variants[encoding], mimetype=asset.mimetype, headers=headers)
+
+    @staticmethod
+    def _negotiate(asset):
+        accepted = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.variants and accepted[encoding] > 0:
+                return encoding
+        return 'identity'
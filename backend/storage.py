@@ -0,0 +1,244 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from schema import BOOL_COLUMNS, COLUMN_NAMES, TABLE_COLUMNS
+
+# Load environment variables
+load_dotenv()
+
+# Storage configuration: "supabase" (default) or "sqlite"
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(__file__), "predictions.db"))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+
+TABLE = "predictions"
+
+
+class SupabaseStorage:
+    """Predictions table stored in Supabase (remote PostgreSQL over HTTP)"""
+
+    # id is a UUID primary key (see SUPABASE_SETUP.md)
+    id_kind = "str"
+
+    def __init__(self, url=None, key=None):
+        from supabase import create_client
+
+        url = url or os.getenv("SUPABASE_URL")
+        key = key or os.getenv("SUPABASE_ANON_KEY")
+        if not url or not key:
+            raise ValueError("Missing SUPABASE_URL or SUPABASE_ANON_KEY in environment variables")
+        self.client = create_client(url, key)
+
+    def insert(self, rows):
+        result = self.client.table(TABLE).insert(rows).execute()
+        return result.data or []
+
+    def select(self, user_id=None, limit=None):
+        query = self.client.table(TABLE).select("*").order("timestamp", desc=True)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execute().data
+
+    def update(self, prediction_id, update_data):
+        result = self.client.table(TABLE).update(update_data).eq("id", prediction_id).execute()
+        return result.data[0] if result.data else None
+
+    def delete(self, prediction_id):
+        self.client.table(TABLE).delete().eq("id", prediction_id).execute()
+        return True
+
+    def iter_pages(self, columns, start=None, end=None, user_id=None, page_size=5000):
+        """Yield column arrays page by page in (timestamp, id) order (keyset pagination)
+
+        Random UUIDs carry no insertion order, so the keyset is the timestamp with the
+        id as a tie-breaker.
+        """
+        names = ["id", "timestamp"] + [name for name in columns if name not in ("id", "timestamp")]
+        last = None
+        while True:
+            query = (self.client.table(TABLE).select(",".join(names))
+                     .order("timestamp").order("id").limit(page_size))
+            if last is not None:
+                last_timestamp, last_id = last
+                query = query.or_(f'timestamp.gt."{last_timestamp}",'
+                                  f'and(timestamp.eq."{last_timestamp}",id.gt.{last_id})')
+            if start:
+                query = query.gte("timestamp", start)
+            if end:
+                query = query.lt("timestamp", end)
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            rows = query.execute().data
+            if not rows:
+                return
+            yield {name: [row.get(name) for row in rows] for name in names}
+            if len(rows) < page_size:
+                return
+            last = (rows[-1]["timestamp"], rows[-1]["id"])
+
+
+class SQLiteStorage:
+    """Predictions table stored in an embedded SQLite database (WAL mode)"""
+
+    # id is an INTEGER PRIMARY KEY AUTOINCREMENT, so id order is insertion order
+    id_kind = "int"
+
+    def __init__(self, path=SQLITE_PATH, pool_size=SQLITE_POOL_SIZE):
+        self.path = path
+        self.columns = COLUMN_NAMES
+        self.column_set = set(COLUMN_NAMES)
+        self.bool_columns = BOOL_COLUMNS
+        self.pool_size = max(1, pool_size)
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self._update_sql = {}
+
+        # Statements are built once; sqlite3 keeps them compiled per pooled connection
+        placeholders = ", ".join("?" for _ in self.columns)
+        self._insert_sql = f"INSERT INTO {TABLE} ({', '.join(self.columns)}) VALUES ({placeholders})"
+        self._select_all_sql = f"SELECT * FROM {TABLE} ORDER BY timestamp DESC LIMIT ?"
+        self._select_user_sql = f"SELECT * FROM {TABLE} WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?"
+        self._select_id_sql = f"SELECT * FROM {TABLE} WHERE id = ?"
+        self._select_range_sql = f"SELECT * FROM {TABLE} WHERE id BETWEEN ? AND ? ORDER BY id"
+        self._delete_sql = f"DELETE FROM {TABLE} WHERE id = ?"
+
+        self._create_schema()
+
+    def _connect(self):
+        """Open a connection configured for concurrent readers and a single writer"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection from the shared pool; it (and its statement cache) outlives the request thread"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._created < self.pool_size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._pool.get(timeout=30)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _create_schema(self):
+        columns_sql = ",\n    ".join(f"{name} {sql_type}" for name, sql_type in TABLE_COLUMNS)
+        with self._connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} (\n    id INTEGER PRIMARY KEY AUTOINCREMENT,\n    {columns_sql}\n)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_user_timestamp ON {TABLE} (user_id, timestamp DESC)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_timestamp ON {TABLE} (timestamp DESC)")
+
+    def _to_dict(self, row):
+        record = dict(row)
+        for name in self.bool_columns:
+            if record[name] is not None:
+                record[name] = bool(record[name])
+        return record
+
+    def insert(self, rows):
+        """Insert rows in a single transaction and return them with their ids"""
+        if not rows:
+            return []
+        params = [tuple(row.get(name) for name in self.columns) for row in rows]
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if len(params) == 1:
+                    cursor = conn.execute(self._insert_sql, params[0])
+                    first_id = last_id = cursor.lastrowid
+                else:
+                    conn.executemany(self._insert_sql, params)
+                    # The write lock is held, so the batch received consecutive ids
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last_id - len(params) + 1
+                inserted = conn.execute(self._select_range_sql, (first_id, last_id)).fetchall()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [self._to_dict(row) for row in inserted]
+
+    def select(self, user_id=None, limit=None):
+        limit = -1 if limit is None else limit
+        with self._connection() as conn:
+            if user_id is not None:
+                rows = conn.execute(self._select_user_sql, (user_id, limit)).fetchall()
+            else:
+                rows = conn.execute(self._select_all_sql, (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def update(self, prediction_id, update_data):
+        keys = tuple(key for key in update_data if key in self.column_set)
+        if not keys:
+            return None
+        sql = self._update_sql.get(keys)
+        if sql is None:
+            assignments = ", ".join(f"{key} = ?" for key in keys)
+            sql = self._update_sql[keys] = f"UPDATE {TABLE} SET {assignments} WHERE id = ?"
+
+        with self._connection() as conn:
+            conn.execute(sql, tuple(update_data[key] for key in keys) + (prediction_id,))
+            row = conn.execute(self._select_id_sql, (prediction_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def delete(self, prediction_id):
+        with self._connection() as conn:
+            conn.execute(self._delete_sql, (prediction_id,))
+        return True
+
+    def iter_pages(self, columns, start=None, end=None, user_id=None, page_size=5000):
+        """Yield column arrays page by page in id order (keyset pagination)"""
+        names = ["id"] + [name for name in columns if name in self.column_set and name != "id"]
+        where, params = ["id > ?"], []
+        if start:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            where.append("timestamp < ?")
+            params.append(end)
+        if user_id is not None:
+            where.append("user_id = ?")
+            params.append(user_id)
+        sql = f"SELECT {', '.join(names)} FROM {TABLE} WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+        bool_names = [name for name in names if name in self.bool_columns]
+
+        last_id = 0
+        while True:
+            # Borrow a connection per page so a slow export client does not pin one
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None  # plain tuples, transposed straight into columns
+                rows = cursor.execute(sql, (last_id, *params, page_size)).fetchall()
+            if not rows:
+                return
+            page = dict(zip(names, map(list, zip(*rows))))
+            for name in bool_names:
+                page[name] = [None if value is None else bool(value) for value in page[name]]
+            yield page
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+
+def create_storage(backend=DATABASE_BACKEND):
+    """Create the storage backend selected by DATABASE_BACKEND"""
+    if backend == "sqlite":
+        return SQLiteStorage()
+    if backend == "supabase":
+        return SupabaseStorage()
+    raise ValueError(f"Unknown DATABASE_BACKEND: {backend}")
@@ -0,0 +1,81 @@
+import math
+
+from schema import BASELINE_CATEGORIES, DERIVED_FEATURES, INT_FEATURES, RAW_CATEGORICALS, feature_info
+
+# Lower bounds beyond "is a finite number"; Income must be positive because
+# several derived features divide by it
+MINIMUMS = {"Income": (0, False), "Age": (0, True), "Dependents": (0, True)}
+
+
+def _number_check(key, integer, minimum):
+    """Compile the check for one numeric field into a closure"""
+    bound, inclusive = minimum if minimum else (None, True)
+
+    def check(value):
+        if isinstance(value, bool) or value is None:
+            return None, "must be a number"
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None, "must be a number"
+        if not math.isfinite(number):
+            return None, "must be a finite number"
+        if integer:
+            if not number.is_integer():
+                return None, "must be a whole number"
+            number = int(number)
+        if bound is not None and (number < bound if inclusive else number <= bound):
+            return None, f"must be {'at least' if inclusive else 'greater than'} {bound}"
+        return number, None
+
+    return key, check
+
+
+def _choice_check(key, choices):
+    """Compile the check for one categorical field into a closure"""
+    allowed = frozenset(choices)
+    message = f"must be one of: {', '.join(sorted(allowed))}"
+
+    def check(value):
+        if value not in allowed:
+            return None, message
+        return value, None
+
+    return key, check
+
+
+def build_validator(feature_info):
+    """Generate the request validator from the raw inputs implied by feature_info.json"""
+    checks = []
+    for key in feature_info['numerical_features']:
+        if key not in DERIVED_FEATURES:
+            checks.append(_number_check(key, key in INT_FEATURES, MINIMUMS.get(key)))
+
+    for key in RAW_CATEGORICALS:
+        prefix = f"{key}_"
+        choices = [name[len(prefix):] for name in feature_info['categorical_features'] if name.startswith(prefix)]
+        checks.append(_choice_check(key, choices + [BASELINE_CATEGORIES[key]]))
+
+    checks = tuple(checks)
+
+    def validate(data):
+        """Return (converted values, errors); every field is checked, not just the first bad one"""
+        if not isinstance(data, dict):
+            return None, {"_": "request body must be a JSON object"}
+        values, errors = {}, {}
+        for key, check in checks:
+            if key not in data:
+                errors[key] = "is required"
+                continue
+            value, error = check(data[key])
+            if error:
+                errors[key] = error
+            else:
+                values[key] = value
+        return values, errors
+
+    validate.fields = tuple(key for key, _ in checks)
+    return validate
+
+
+validate_prediction_input = build_validator(feature_info)
@@ -14,7 +14,7 @@ import { Progress } from "@/components/ui/progress"
 import { Badge } from "@/components/ui/badge"
 import { useUserData } from '@/hooks/useUserData'
 import { predictionAPI } from '@/services/api'
-import { PredictionInput, PredictionOutput } from '@/types/user-data'
+import { PredictionInput, PredictionOutput, ExplanationOutput, HeadExplanation } from '@/types/user-data'
 import { useToast } from '@/hooks/use-toast'
 
 const formSchema = z.object({
@@ -42,6 +42,7 @@ type FormData = z.infer<typeof formSchema>
 const FinancialReport = () => {
   const [isSubmitting, setIsSubmitting] = useState(false)
   const [mlResponse, setMlResponse] = useState<PredictionOutput | null>(null)
+  const [explanation, setExplanation] = useState<ExplanationOutput | null>(null)
   const [showResults, setShowResults] = useState(false)
   const { data: userData, isLoading: userDataLoading } = useUserData()
   const { toast } = useToast()
@@ -218,8 +219,14 @@ const FinancialReport = () => {
 
       const response = await predictionAPI.predict(predictionInput)
       setMlResponse(response)
+      setExplanation(null)
       setShowResults(true)
 
+      // Feature drivers are optional; the report renders without them
+      predictionAPI.explain(predictionInput)
+        .then(setExplanation)
+        .catch((error) => console.error("Error explaining report:", error))
+
       toast({
         title: "Report Generated",
         description: "Your AI financial report has been generated successfully!",
@@ -242,6 +249,22 @@ const FinancialReport = () => {
     return { level: "High", color: "bg-red-500", textColor: "text-red-700" }
   }
 
+  const formatFeature = (feature: string) => feature.replace(/_/g, ' ')
+
+  const renderDrivers = (title: string, head: HeadExplanation) => (
+    <div className="p-6 bg-white/50 dark:bg-black/20 rounded-xl space-y-3">
+      <h3 className="text-lg font-semibold">{title}</h3>
+      {head.top_features.map(({ feature, attribution }) => (
+        <div key={feature} className="flex justify-between items-center">
+          <span className="text-sm">{formatFeature(feature)}</span>
+          <Badge variant="outline" className={attribution >= 0 ? "text-green-700 border-current" : "text-red-700 border-current"}>
+            {attribution >= 0 ? "+" : ""}{(attribution * 100).toFixed(1)} pts
+          </Badge>
+        </div>
+      ))}
+    </div>
+  )
+
   // Show existing results if available
   if (showResults && mlResponse) {
     const riskInfo = getRiskLevel(mlResponse.multi_task_model.risk_score)
@@ -378,6 +401,27 @@ const FinancialReport = () => {
               </div>
             </CardContent>
           </Card>
+
+          {/* Feature Drivers */}
+          {explanation && (
+            <Card className="rounded-2xl border-0 shadow-lg lg:col-span-2">
+              <CardHeader className="pb-4">
+                <CardTitle className="flex items-center space-x-3 text-xl">
+                  <div className="p-2 bg-primary/10 rounded-xl">
+                    <Brain className="h-6 w-6 text-primary" />
+                  </div>
+                  <span>What Drives These Predictions</span>
+                </CardTitle>
+                <CardDescription>
+                  How much each input moved the score (in percentage points)
+                </CardDescription>
+              </CardHeader>
+              <CardContent className="grid grid-cols-1 md:grid-cols-2 gap-8">
+                {renderDrivers("Savings Achievement", explanation.savings)}
+                {renderDrivers("Financial Risk", explanation.risk)}
+              </CardContent>
+            </Card>
+          )}
         </div>
       </div>
     )
@@ -1,5 +1,5 @@
 // src/services/api.js or api.ts
-import { PredictionInput, PredictionOutput, ChatMessage, ChatResponse } from '@/types/user-data';
+import { PredictionInput, PredictionOutput, ExplanationOutput, ChatMessage, ChatResponse } from '@/types/user-data';
 
 // Use relative URLs since we're serving from the same port
 const API_BASE_URL = '';
@@ -66,6 +66,30 @@ export const predictionAPI = {
     }
   },
 
+  // Per-feature attributions for the savings and risk heads
+  explain: async (input: PredictionInput, topK = 5): Promise<ExplanationOutput> => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/explain`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'application/json',
+        },
+        body: JSON.stringify({ input, top_k: topK }),
+      });
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(`HTTP ${response.status}: ${errorText || 'Failed to explain prediction'}`);
+      }
+
+      return response.json();
+    } catch (error) {
+      console.error('Explain API Error:', error);
+      throw error;
+    }
+  },
+
   // Health check endpoint
   healthCheck: async () => {
     try {
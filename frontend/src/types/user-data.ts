@@ -80,6 +80,24 @@ export interface PredictionOutput {
   };
 }
 
+export interface FeatureAttribution {
+  feature: string;
+  attribution: number;
+}
+
+export interface HeadExplanation {
+  prediction: number;
+  baseline_prediction: number;
+  attributions: Record<string, number>;
+  top_features: FeatureAttribution[];
+}
+
+export interface ExplanationOutput {
+  method: string;
+  savings: HeadExplanation;
+  risk: HeadExplanation;
+}
+
 export interface ChatMessage {
   message: string;
 }
@@ -0,0 +1,160 @@
+import numpy as np
+from tensorflow.keras import layers, Model
+
+
+class FinancialAttentionModel:
+    def __init__(self, n_features, n_heads=8, d_model=128, dropout_rate=0.1):
+        self.n_features = n_features
+        self.n_heads = n_heads
+        self.d_model = d_model
+        self.dropout_rate = dropout_rate
+
+    def positional_encoding(self, seq_len, d_model):
+        """Create positional encoding for sequence data"""
+        position = np.arange(seq_len)[:, np.newaxis]
+        div_term = np.exp(np.arange(0, d_model, 2) * -(np.log(10000.0) / d_model))
+
+        pos_encoding = np.zeros((seq_len, d_model))
+        pos_encoding[:, 0::2] = np.sin(position * div_term)
+        pos_encoding[:, 1::2] = np.cos(position * div_term)
+
+        return pos_encoding
+
+    def multi_head_attention_block(self, inputs, name_prefix="attention"):
+        """Multi-head attention block with residual connection"""
+        # Multi-head self-attention
+        attention_output = layers.MultiHeadAttention(
+            num_heads=self.n_heads,
+            key_dim=self.d_model // self.n_heads,
+            dropout=self.dropout_rate,
+            name=f"{name_prefix}_mha"
+        )(inputs, inputs)
+
+        # Add & Norm
+        attention_output = layers.Dropout(self.dropout_rate)(attention_output)
+        attention_output = layers.Add(name=f"{name_prefix}_add1")([inputs, attention_output])
+        attention_output = layers.LayerNormalization(name=f"{name_prefix}_norm1")(attention_output)
+
+        # Feed-forward network
+        ffn_output = layers.Dense(self.d_model * 4, activation='relu', name=f"{name_prefix}_ffn1")(attention_output)
+        ffn_output = layers.Dropout(self.dropout_rate)(ffn_output)
+        ffn_output = layers.Dense(self.d_model, name=f"{name_prefix}_ffn2")(ffn_output)
+
+        # Add & Norm
+        ffn_output = layers.Dropout(self.dropout_rate)(ffn_output)
+        ffn_output = layers.Add(name=f"{name_prefix}_add2")([attention_output, ffn_output])
+        output = layers.LayerNormalization(name=f"{name_prefix}_norm2")(ffn_output)
+
+        return output
+
+    def build_classification_model(self, task_name="savings_prediction"):
+        """Build attention model for binary classification"""
+        # Input layer - treating each feature as a sequence element
+        inputs = layers.Input(shape=(self.n_features,), name="financial_features")
+
+        # Reshape for attention mechanism (batch_size, sequence_length=1, features)
+        x = layers.Reshape((1, self.n_features))(inputs)
+
+        # Project to d_model dimensions
+        x = layers.Dense(self.d_model, name="input_projection")(x)
+
+        # Add positional encoding (even though sequence length is 1, useful for extensibility)
+        pos_encoding = self.positional_encoding(1, self.d_model)
+        x = x + pos_encoding
+
+        # Multiple attention blocks
+        x = self.multi_head_attention_block(x, "attention_block_1")
+        x = self.multi_head_attention_block(x, "attention_block_2")
+
+        # Global average pooling
+        x = layers.GlobalAveragePooling1D()(x)
+
+        # Final classification layers
+        x = layers.Dense(256, activation='relu', name="dense_1")(x)
+        x = layers.Dropout(self.dropout_rate)(x)
+        x = layers.Dense(128, activation='relu', name="dense_2")(x)
+        x = layers.Dropout(self.dropout_rate)(x)
+        x = layers.Dense(64, activation='relu', name="dense_3")(x)
+
+        # Output layer
+        outputs = layers.Dense(1, activation='sigmoid', name=task_name)(x)
+
+        model = Model(inputs=inputs, outputs=outputs, name=f"financial_{task_name}_model")
+
+        return model
+
+    def build_multi_task_model(self):
+        """Build multi-task attention model for multiple predictions"""
+        # Input layer
+        inputs = layers.Input(shape=(self.n_features,), name="financial_features")
+
+        # Reshape for attention mechanism
+        x = layers.Reshape((1, self.n_features))(inputs)
+
+        # Project to d_model dimensions
+        x = layers.Dense(self.d_model, name="input_projection")(x)
+
+        # Add positional encoding
+        pos_encoding = self.positional_encoding(1, self.d_model)
+        x = x + pos_encoding
+
+        # Shared attention blocks
+        shared_features = self.multi_head_attention_block(x, "shared_attention_1")
+        shared_features = self.multi_head_attention_block(shared_features, "shared_attention_2")
+
+        # Global pooling
+        pooled_features = layers.GlobalAveragePooling1D()(shared_features)
+
+        # Task-specific branches
+        # 1. Savings Achievement Classification
+        savings_branch = layers.Dense(128, activation='relu', name="savings_dense_1")(pooled_features)
+        savings_branch = layers.Dropout(self.dropout_rate)(savings_branch)
+        savings_branch = layers.Dense(64, activation='relu', name="savings_dense_2")(savings_branch)
+        savings_output = layers.Dense(1, activation='sigmoid', name="can_achieve_savings")(savings_branch)
+
+        # 2. Savings Amount Regression
+        amount_branch = layers.Dense(128, activation='relu', name="amount_dense_1")(pooled_features)
+        amount_branch = layers.Dropout(self.dropout_rate)(amount_branch)
+        amount_branch = layers.Dense(64, activation='relu', name="amount_dense_2")(amount_branch)
+        amount_output = layers.Dense(1, name="savings_amount")(amount_branch)
+
+        # 3. Financial Risk Classification
+        risk_branch = layers.Dense(128, activation='relu', name="risk_dense_1")(pooled_features)
+        risk_branch = layers.Dropout(self.dropout_rate)(risk_branch)
+        risk_branch = layers.Dense(64, activation='relu', name="risk_dense_2")(risk_branch)
+        risk_output = layers.Dense(1, activation='sigmoid', name="financial_risk")(risk_branch)
+
+        model = Model(
+            inputs=inputs,
+            outputs=[savings_output, amount_output, risk_output],
+            name="financial_multi_task_model"
+        )
+
+        return model
+
+    def build_regression_model(self, task_name="savings_amount"):
+        """Build attention model for regression tasks"""
+        inputs = layers.Input(shape=(self.n_features,), name="financial_features")
+
+        x = layers.Reshape((1, self.n_features))(inputs)
+        x = layers.Dense(self.d_model, name="input_projection")(x)
+
+        pos_encoding = self.positional_encoding(1, self.d_model)
+        x = x + pos_encoding
+
+        x = self.multi_head_attention_block(x, "attention_block_1")
+        x = self.multi_head_attention_block(x, "attention_block_2")
+
+        x = layers.GlobalAveragePooling1D()(x)
+
+        x = layers.Dense(256, activation='relu', name="dense_1")(x)
+        x = layers.Dropout(self.dropout_rate)(x)
+        x = layers.Dense(128, activation='relu', name="dense_2")(x)
+        x = layers.Dropout(self.dropout_rate)(x)
+        x = layers.Dense(64, activation='relu', name="dense_3")(x)
+
+        outputs = layers.Dense(1, name=task_name)(x)
+
+        model = Model(inputs=inputs, outputs=outputs, name=f"financial_{task_name}_model")
+
+        return model
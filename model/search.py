@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter search for FinancialAttentionModel on CPU.
+
+Trials run in a process pool and share the memory-mapped feature cache built by
+train.py. Random search prunes trials whose val_loss falls behind the median
+curve of finished trials; successive halving trains every config on a small
+epoch budget and promotes the best 1/eta to larger budgets. Each evaluation is
+appended to a JSONL results store with its parameter count and single-row
+inference latency, and configurations are ranked by an objective that
+penalises both, so smaller models that match accuracy win. Latency is measured
+after training, one trial at a time with the rest of the pool idle, so it
+reflects the model rather than CPU contention from concurrent trials.
+
+Usage:
+    python model/search.py --model savings --strategy halving --trials 27 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+from train import (DATA_FILE, MODEL_DIR, SEED, TASKS, build_model, init_worker, load_feature_cache,
+                   make_dataset, pin_threads, prepare_cache, select_targets)
+
+RESULTS_DIR = os.path.join(MODEL_DIR, 'search_results')
+
+# Discrete choices for the architecture, ranges for the continuous parameters
+SEARCH_SPACE = {
+    "n_heads": [1, 2, 4, 8],
+    "d_model": [16, 32, 64, 128],
+    "dropout_rate": (0.0, 0.3),
+    "learning_rate": (1e-4, 3e-3),  # log-uniform
+}
+MIN_KEY_DIM = 4
+
+
+def sample_config(rng):
+    """Draw one configuration; d_model must split into heads of at least MIN_KEY_DIM"""
+    while True:
+        n_heads = int(rng.choice(SEARCH_SPACE['n_heads']))
+        d_model = int(rng.choice(SEARCH_SPACE['d_model']))
+        if d_model % n_heads == 0 and d_model // n_heads >= MIN_KEY_DIM:
+            break
+    low, high = SEARCH_SPACE['learning_rate']
+    return {
+        "n_heads": n_heads,
+        "d_model": d_model,
+        "dropout_rate": round(float(rng.uniform(*SEARCH_SPACE['dropout_rate'])), 3),
+        "learning_rate": float(np.exp(rng.uniform(np.log(low), np.log(high)))),
+    }
+
+
+def objective(result, latency_weight, param_weight):
+    """val_loss scaled up by serving latency (ms) and parameter count (millions)"""
+    penalty = 1 + latency_weight * result['latency_p50_ms'] + param_weight * result['param_count'] / 1e6
+    return result['val_loss'] * penalty
+
+
+def median_curve(histories, grace_epochs):
+    """Per-epoch median val_loss of finished trials, used as the pruning threshold"""
+    curve = {}
+    max_len = max((len(h) for h in histories), default=0)
+    for epoch in range(grace_epochs, max_len):
+        values = [h[epoch] for h in histories if len(h) > epoch]
+        if len(values) >= 2:
+            curve[epoch] = float(np.median(values))
+    return curve
+
+
+def measure_latency(model, X, repeats=100, warmup=10):
+    """Single-row inference latency in milliseconds (p50, p95)"""
+    import tensorflow as tf
+
+    sample = tf.constant(np.asarray(X[:1]))
+    for _ in range(warmup):
+        model(sample, training=False)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model(sample, training=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 95))
+
+
+def _pruning_callback(curve):
+    """Stop a trial as soon as its val_loss is worse than the median curve"""
+    import tensorflow as tf
+
+    class MedianPruning(tf.keras.callbacks.Callback):
+        pruned_at = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            threshold = curve.get(epoch)
+            if threshold is not None and logs and logs.get('val_loss', 0) > threshold:
+                self.pruned_at = epoch
+                self.model.stop_training = True
+
+    return MedianPruning()
+
+
+def run_trial(trial, cache_path, work_dir, config):
+    """Train one configuration for a budget of epochs and measure it"""
+    import tensorflow as tf
+    from tensorflow.keras import callbacks
+
+    tf.keras.backend.clear_session()
+    tf.keras.utils.set_random_seed(config['seed'] + trial['trial_id'])
+
+    task = TASKS[config['model']]
+    data = load_feature_cache(cache_path)
+    y_train = select_targets(data['y_train'], task['targets'])
+    y_test = select_targets(data['y_test'], task['targets'])
+    X_test = np.asarray(data['X_test'])
+
+    train_ds = make_dataset(data['X_train'], y_train, config['batch_size'], shuffle=True, seed=config['seed'])
+    val_ds = make_dataset(X_test, y_test, config['batch_size'])
+
+    model = build_model(config['model'], X_test.shape[1], trial['params'])
+    weights_file = os.path.join(work_dir, f"trial_{trial['trial_id']}.weights.h5")
+    if trial['initial_epoch'] and os.path.exists(weights_file):
+        model.load_weights(weights_file)
+
+    pruning = _pruning_callback(trial.get('prune_curve') or {})
+    start = time.perf_counter()
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        initial_epoch=trial['initial_epoch'],
+        epochs=trial['epochs'],
+        callbacks=[
+            callbacks.EarlyStopping(monitor='val_loss', patience=config['patience'], restore_best_weights=True),
+            pruning,
+        ],
+        verbose=0
+    )
+    train_seconds = time.perf_counter() - start
+    model.save_weights(weights_file)
+
+    val_losses = [float(v) for v in history.history['val_loss']]
+    return {
+        "trial_id": trial['trial_id'],
+        "rung": trial.get('rung', 0),
+        "params": trial['params'],
+        "epochs": trial['epochs'],
+        "epochs_run": trial['initial_epoch'] + len(val_losses),
+        "val_loss_history": trial.get('history', []) + val_losses,
+        "val_loss": min(val_losses) if val_losses else float('inf'),
+        "pruned": pruning.pruned_at is not None,
+        "param_count": int(model.count_params()),
+        "train_seconds": round(train_seconds, 2),
+    }
+
+
+def measure_trial(result, cache_path, work_dir, config):
+    """Rebuild a trained trial from its saved weights and time single-row inference"""
+    import tensorflow as tf
+
+    tf.keras.backend.clear_session()
+    X_test = load_feature_cache(cache_path)['X_test']
+    model = build_model(config['model'], X_test.shape[1], result['params'])
+    model.load_weights(os.path.join(work_dir, f"trial_{result['trial_id']}.weights.h5"))
+    latency_p50, latency_p95 = measure_latency(model, X_test)
+    return {**result, "latency_p50_ms": latency_p50, "latency_p95_ms": latency_p95}
+
+
+def measure_serially(pool, results, cache_path, work_dir, config, args):
+    """Time trials one at a time on an otherwise idle pool, then score them"""
+    return [
+        _score(pool.submit(measure_trial, result, cache_path, work_dir, config).result(), args)
+        for result in results
+    ]
+
+
+class ResultsStore:
+    """Append-only JSONL store of trial evaluations"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def add(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def _score(result, args):
+    result['objective'] = objective(result, args.latency_weight, args.param_weight)
+    return result
+
+
+def random_search(pool, cache_path, work_dir, config, args, store, rng):
+    """Random search with median-curve pruning, keeping every worker busy"""
+    configs = [sample_config(rng) for _ in range(args.trials)]
+    results, histories, pending = [], [], {}
+    next_id = 0
+
+    def submit():
+        nonlocal next_id
+        trial = {
+            "trial_id": next_id,
+            "params": configs[next_id],
+            "epochs": args.max_epochs,
+            "initial_epoch": 0,
+            "prune_curve": median_curve(histories, args.grace_epochs),
+        }
+        pending[pool.submit(run_trial, trial, cache_path, work_dir, config)] = next_id
+        next_id += 1
+
+    while next_id < len(configs) and len(pending) < args.workers:
+        submit()
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            result = future.result()
+            if result['pruned']:
+                # Pruned trials are never ranked, so they are not timed
+                store.add(result)
+                _print_result(result)
+            else:
+                histories.append(result['val_loss_history'])
+                results.append(result)
+            if next_id < len(configs):
+                submit()
+
+    # Every trial has finished training: time the completed ones without contention
+    results = measure_serially(pool, results, cache_path, work_dir, config, args)
+    for result in results:
+        store.add(result)
+        _print_result(result)
+    return results
+
+
+def successive_halving(pool, cache_path, work_dir, config, args, store, rng):
+    """Train all configs on a small budget, promote the best 1/eta each rung"""
+    survivors = [
+        {"trial_id": i, "params": sample_config(rng), "history": []}
+        for i in range(args.trials)
+    ]
+    results, budget, previous_budget, rung = [], args.min_epochs, 0, 0
+    while survivors:
+        trials = [
+            {**s, "rung": rung, "epochs": budget, "initial_epoch": previous_budget}
+            for s in survivors
+        ]
+        futures = [pool.submit(run_trial, t, cache_path, work_dir, config) for t in trials]
+        # The rung is a barrier: once it has trained, time each survivor on the drained pool
+        rung_results = measure_serially(pool, [f.result() for f in futures], cache_path, work_dir, config, args)
+        for result in rung_results:
+            results.append(result)
+            store.add(result)
+            _print_result(result)
+
+        if budget >= args.max_epochs or len(survivors) <= 1:
+            break
+        rung_results.sort(key=lambda r: r['objective'])
+        keep = max(1, len(rung_results) // args.eta)
+        survivors = [
+            {"trial_id": r['trial_id'], "params": r['params'], "history": r['val_loss_history']}
+            for r in rung_results[:keep]
+        ]
+        previous_budget, budget = budget, min(args.max_epochs, budget * args.eta)
+        rung += 1
+    return results
+
+
+def _print_result(result):
+    status = "pruned" if result['pruned'] else f"rung {result['rung']}"
+    params = result['params']
+    line = (f"trial {result['trial_id']:>3} [{status}] heads={params['n_heads']} d_model={params['d_model']} "
+            f"val_loss={result['val_loss']:.4f} params={result['param_count']:,}")
+    if 'objective' in result:
+        line += f" latency={result['latency_p50_ms']:.2f}ms objective={result['objective']:.4f}"
+    print(line)
+
+
+def best_results(results, top_k):
+    """Best evaluation per trial (its final rung), ranked by objective"""
+    latest = {}
+    for result in results:
+        if result['pruned']:
+            continue
+        current = latest.get(result['trial_id'])
+        if current is None or result['rung'] >= current['rung']:
+            latest[result['trial_id']] = result
+    return sorted(latest.values(), key=lambda r: r['objective'])[:top_k]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hyperparameter search for FinancialAttentionModel")
+    parser.add_argument('--data', default=DATA_FILE, help="Processed financial data CSV")
+    parser.add_argument('--model', choices=list(TASKS), default='savings')
+    parser.add_argument('--strategy', choices=['random', 'halving'], default='halving')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-epochs', type=int, default=2, help="Successive halving: first rung budget")
+    parser.add_argument('--max-epochs', type=int, default=20)
+    parser.add_argument('--eta', type=int, default=3, help="Successive halving: keep 1/eta per rung")
+    parser.add_argument('--grace-epochs', type=int, default=3, help="Random search: epochs before pruning")
+    parser.add_argument('--patience', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument('--threads', type=int, default=None, help="Threads per worker (default: cpus / workers)")
+    parser.add_argument('--latency-weight', type=float, default=0.05, help="Objective penalty per ms of latency")
+    parser.add_argument('--param-weight', type=float, default=0.1, help="Objective penalty per million params")
+    parser.add_argument('--study', default=None, help="Results store name (default: timestamped)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--top', type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.workers = max(1, args.workers)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    study = args.study or f"{args.model}-{args.strategy}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+    cache_path = prepare_cache(args.data)
+    work_dir = os.path.join(RESULTS_DIR, study)
+    os.makedirs(work_dir, exist_ok=True)
+    store = ResultsStore(os.path.join(RESULTS_DIR, f'{study}.jsonl'))
+
+    config = {
+        "model": args.model,
+        "batch_size": args.batch_size,
+        "patience": args.patience,
+        "seed": args.seed,
+    }
+    rng = np.random.default_rng(args.seed)
+
+    print(f"🔍 {args.strategy} search over {args.trials} configs for '{args.model}' "
+          f"with {args.workers} worker(s) x {threads} thread(s)")
+    start = time.perf_counter()
+    pin_threads(threads)
+    context = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                             initializer=init_worker, initargs=(threads, args.seed)) as pool:
+        search = random_search if args.strategy == 'random' else successive_halving
+        results = search(pool, cache_path, work_dir, config, args, store, rng)
+    print(f"Search finished in {time.perf_counter() - start:.1f}s")
+
+    best = best_results(results, args.top)
+    with open(os.path.join(RESULTS_DIR, f'{study}_best.json'), 'w') as f:
+        json.dump(best, f, indent=2)
+
+    print(f"\n🏆 Top {len(best)} configurations (results in {store.path}):")
+    for result in best:
+        _print_result(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Training pipeline for the savings, amount and multi-task attention models.
+
+The preprocessed feature matrix is cached as memory-mapped .npy files keyed by
+a hash of feature_info.json (plus the source CSV), so retraining skips the
+pandas parse. The three models train concurrently in separate processes with
+pinned thread counts, and the run is written to a registry bundle with metrics.
+
+Usage:
+    python model/train.py --epochs 20 --workers 3 --publish
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+# Paths
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(MODEL_DIR)
+FEATURE_INFO_FILE = os.path.join(MODEL_DIR, 'feature_info.json')
+DATA_FILE = os.path.join(ROOT_DIR, 'data', 'processed_financial_data.csv')
+CACHE_DIR = os.path.join(MODEL_DIR, 'cache')
+REGISTRY_DIR = os.path.join(MODEL_DIR, 'registry')
+TRAINED_MODEL_DIR = os.path.join(MODEL_DIR, 'trained_model')
+
+SEED = 42
+TEST_SIZE = 0.2
+TARGET_NAMES = ['can_achieve_savings', 'savings_amount', 'financial_risk']
+
+# Per-model training configuration (mirrors train.ipynb)
+TASKS = {
+    "savings": {
+        "builder": "build_classification_model",
+        "builder_args": ("savings_achievement",),
+        "targets": "can_achieve_savings",
+        "loss": "binary_crossentropy",
+        "metrics": ["accuracy", "precision", "recall"],
+        "checkpoint_monitor": "val_accuracy",
+        "patience": 10,
+        "lr_patience": 5,
+    },
+    "amount": {
+        "builder": "build_regression_model",
+        "builder_args": ("savings_amount",),
+        "targets": "savings_amount",
+        "loss": "mse",
+        "metrics": ["mae", "mse"],
+        "checkpoint_monitor": "val_mae",
+        "patience": 10,
+        "lr_patience": 5,
+    },
+    "multi_task": {
+        "builder": "build_multi_task_model",
+        "builder_args": (),
+        "targets": TARGET_NAMES,
+        "loss": {
+            "can_achieve_savings": "binary_crossentropy",
+            "savings_amount": "mse",
+            "financial_risk": "binary_crossentropy",
+        },
+        "loss_weights": {
+            "can_achieve_savings": 1.0,
+            "savings_amount": 0.001,  # Scale down due to different magnitude
+            "financial_risk": 1.0,
+        },
+        "metrics": {
+            "can_achieve_savings": ["accuracy"],
+            "savings_amount": ["mae"],
+            "financial_risk": ["accuracy"],
+        },
+        "checkpoint_monitor": "val_loss",
+        "patience": 15,
+        "lr_patience": 7,
+    },
+}
+
+
+def _file_sha256(path):
+    """Hash a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(data_file=DATA_FILE, feature_info_file=FEATURE_INFO_FILE):
+    """Cache key for the preprocessed arrays: feature_info.json hash plus source CSV fingerprint"""
+    stat = os.stat(data_file)
+    digest = hashlib.sha256()
+    digest.update(_file_sha256(feature_info_file).encode())
+    digest.update(f"{os.path.abspath(data_file)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    digest.update(f"{SEED}:{TEST_SIZE}".encode())
+    return digest.hexdigest()[:16]
+
+
+def build_feature_cache(cache_path, data_file=DATA_FILE, feature_info_file=FEATURE_INFO_FILE):
+    """Parse the processed CSV once and write contiguous train/test .npy arrays"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    with open(feature_info_file, 'r') as f:
+        feature_info = json.load(f)
+    feature_columns = feature_info['numerical_features'] + feature_info['categorical_features']
+
+    processed_data = pd.read_csv(data_file)
+    X = processed_data[feature_columns].to_numpy(dtype=np.float32)
+
+    # Targets as defined in train.ipynb
+    savings_gap = processed_data['Savings_Gap']
+    y = np.column_stack([
+        processed_data['Can_Achieve_Savings'].to_numpy(dtype=np.float32),
+        processed_data['Desired_Savings'].to_numpy(dtype=np.float32),
+        (savings_gap > savings_gap.quantile(0.7)).to_numpy(dtype=np.float32),
+    ])
+
+    # One shared stratified split so every model is evaluated on the same rows
+    indices = np.arange(len(X))
+    train_idx, test_idx = train_test_split(
+        indices, test_size=TEST_SIZE, random_state=SEED, stratify=y[:, 0])
+
+    # Write into a temp dir and rename, so a crashed run never leaves a half-built cache
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    np.save(os.path.join(tmp_path, 'X_train.npy'), np.ascontiguousarray(X[train_idx]))
+    np.save(os.path.join(tmp_path, 'X_test.npy'), np.ascontiguousarray(X[test_idx]))
+    np.save(os.path.join(tmp_path, 'y_train.npy'), np.ascontiguousarray(y[train_idx]))
+    np.save(os.path.join(tmp_path, 'y_test.npy'), np.ascontiguousarray(y[test_idx]))
+
+    meta = {
+        "created": datetime.now().isoformat(),
+        "data_file": os.path.abspath(data_file),
+        "feature_info_sha256": _file_sha256(feature_info_file),
+        "feature_columns": feature_columns,
+        "target_columns": TARGET_NAMES,
+        "n_train": int(len(train_idx)),
+        "n_test": int(len(test_idx)),
+    }
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if os.path.exists(cache_path):
+        shutil.rmtree(tmp_path)
+    else:
+        os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def prepare_cache(data_file=DATA_FILE, feature_info_file=FEATURE_INFO_FILE, cache_dir=CACHE_DIR):
+    """Return the cache directory for the current inputs, building it on a miss"""
+    cache_path = os.path.join(cache_dir, cache_key(data_file, feature_info_file))
+    if os.path.exists(os.path.join(cache_path, 'meta.json')):
+        print(f"Using cached features: {cache_path}")
+        return cache_path
+
+    print(f"Building feature cache from {data_file}...")
+    os.makedirs(cache_dir, exist_ok=True)
+    return build_feature_cache(cache_path, data_file, feature_info_file)
+
+
+def load_feature_cache(cache_path):
+    """Open the cached arrays memory-mapped (read-only, shared page cache across processes)"""
+    arrays = {
+        name: np.load(os.path.join(cache_path, f'{name}.npy'), mmap_mode='r')
+        for name in ['X_train', 'X_test', 'y_train', 'y_test']
+    }
+    with open(os.path.join(cache_path, 'meta.json'), 'r') as f:
+        arrays['meta'] = json.load(f)
+    return arrays
+
+
+def select_targets(y, targets):
+    """Pick the target column(s) a task trains on"""
+    if isinstance(targets, str):
+        return np.asarray(y[:, TARGET_NAMES.index(targets)])
+    return {name: np.asarray(y[:, TARGET_NAMES.index(name)]) for name in targets}
+
+
+def make_dataset(X, y, batch_size, shuffle=False, seed=SEED):
+    """Build a prefetching tf.data pipeline that gathers batches from the memory-mapped arrays.
+
+    Only row indices go through tf.data; each batch is read from the memmap on demand,
+    so concurrent workers share the page cache instead of each copying X into a tensor.
+    """
+    import tensorflow as tf
+
+    names = list(y) if isinstance(y, dict) else None
+    targets = [y[name] for name in names] if names else [y]
+    n_features = X.shape[1]
+
+    def gather(indices):
+        indices = np.sort(indices)  # ascending reads from the memmap; order within a batch is irrelevant
+        return (np.asarray(X[indices], dtype=np.float32),
+                *(np.asarray(target[indices], dtype=np.float32) for target in targets))
+
+    def load(indices):
+        arrays = tf.numpy_function(gather, [indices], [tf.float32] * (1 + len(targets)))
+        features = tf.ensure_shape(arrays[0], [None, n_features])
+        labels = [tf.ensure_shape(array, [None]) for array in arrays[1:]]
+        return features, (dict(zip(names, labels)) if names else labels[0])
+
+    dataset = tf.data.Dataset.range(len(X))
+    if shuffle:
+        dataset = dataset.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).map(load, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+def pin_threads(threads):
+    """Export BLAS/TensorFlow thread counts for worker processes.
+
+    Call in the parent before the pool starts: a spawned worker re-imports this module
+    (and numpy's BLAS pool) before any initializer runs, so the variables must already
+    be in the environment it inherits.
+    """
+    threads = str(max(1, int(threads)))
+    for var in ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                'TF_NUM_INTRAOP_THREADS']:
+        os.environ[var] = threads
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+
+def classification_metrics(y_true, y_prob):
+    """Accuracy, precision and recall at a 0.5 threshold"""
+    y_true = np.asarray(y_true).astype(int).ravel()
+    y_pred = (np.asarray(y_prob).ravel() > 0.5).astype(int)
+    tp = int(np.sum((y_pred == 1) & (y_true == 1)))
+    fp = int(np.sum((y_pred == 1) & (y_true == 0)))
+    fn = int(np.sum((y_pred == 0) & (y_true == 1)))
+    return {
+        "accuracy": float(np.mean(y_pred == y_true)),
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn) if tp + fn else 0.0,
+    }
+
+
+def regression_metrics(y_true, y_pred):
+    """MAE, MSE and RMSE"""
+    errors = np.asarray(y_true).ravel() - np.asarray(y_pred).ravel()
+    mse = float(np.mean(errors ** 2))
+    return {"mae": float(np.mean(np.abs(errors))), "mse": mse, "rmse": float(np.sqrt(mse))}
+
+
+def evaluate_task(task_name, model, X_test, y_test):
+    """Compute held-out metrics for a trained model"""
+    predictions = model.predict(X_test, verbose=0)
+    if task_name == "savings":
+        return classification_metrics(y_test, predictions)
+    if task_name == "amount":
+        return regression_metrics(y_test, predictions)
+    return {
+        "can_achieve_savings": classification_metrics(y_test['can_achieve_savings'], predictions[0]),
+        "savings_amount": regression_metrics(y_test['savings_amount'], predictions[1]),
+        "financial_risk": classification_metrics(y_test['financial_risk'], predictions[2]),
+    }
+
+
+def init_worker(threads, seed):
+    """Import TensorFlow, size its thread pools and seed it for this process"""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(int(threads))
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    tf.keras.utils.set_random_seed(seed)
+    return tf
+
+
+def build_model(task_name, n_features, config):
+    """Build and compile the model for a task with the given hyperparameters"""
+    import tensorflow as tf
+    from attention_model import FinancialAttentionModel
+
+    task = TASKS[task_name]
+    builder = FinancialAttentionModel(
+        n_features=n_features,
+        n_heads=config['n_heads'],
+        d_model=config['d_model'],
+        dropout_rate=config['dropout_rate']
+    )
+    model = getattr(builder, task['builder'])(*task['builder_args'])
+    compile_kwargs = {
+        "optimizer": tf.keras.optimizers.Adam(learning_rate=config['learning_rate']),
+        "loss": task['loss'],
+        "metrics": task['metrics'],
+    }
+    if 'loss_weights' in task:
+        compile_kwargs['loss_weights'] = task['loss_weights']
+    model.compile(**compile_kwargs)
+    return model
+
+
+def train_task(task_name, cache_path, output_dir, config):
+    """Train one model in the current process and return its metrics"""
+    tf = init_worker(config['threads'], config['seed'])
+    from tensorflow.keras import callbacks
+
+    task = TASKS[task_name]
+    data = load_feature_cache(cache_path)
+    y_train = select_targets(data['y_train'], task['targets'])
+    y_test = select_targets(data['y_test'], task['targets'])
+    X_test = np.asarray(data['X_test'])
+
+    train_ds = make_dataset(data['X_train'], y_train, config['batch_size'], shuffle=True, seed=config['seed'])
+    val_ds = make_dataset(X_test, y_test, config['batch_size'])
+
+    model = build_model(task_name, X_test.shape[1], config)
+
+    model_file = os.path.join(output_dir, f'best_{task_name}_model.keras')
+    callbacks_list = [
+        callbacks.EarlyStopping(monitor='val_loss', patience=task['patience'], restore_best_weights=True),
+        callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=task['lr_patience'], min_lr=1e-6),
+        callbacks.ModelCheckpoint(model_file, save_best_only=True, monitor=task['checkpoint_monitor'])
+    ]
+
+    start = time.perf_counter()
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=config['epochs'],
+        callbacks=callbacks_list,
+        verbose=config['verbose']
+    )
+    train_seconds = time.perf_counter() - start
+
+    # Score the checkpoint that ships in the bundle, not the in-memory weights
+    # EarlyStopping restored (those are best by val_loss, not the checkpoint monitor)
+    best_model = tf.keras.models.load_model(model_file, compile=False)
+
+    return {
+        "model": task_name,
+        "file": os.path.basename(model_file),
+        "params": int(best_model.count_params()),
+        "epochs_run": len(history.history['loss']),
+        "best_val_loss": float(min(history.history['val_loss'])),
+        "train_seconds": round(train_seconds, 2),
+        "metrics": evaluate_task(task_name, best_model, X_test, y_test),
+    }
+
+
+def _default_threads(workers):
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def run_training(task_names, cache_path, output_dir, config, workers):
+    """Train the requested models, concurrently when more than one worker is allowed"""
+    results = {}
+    if workers <= 1:
+        for name in task_names:
+            results[name] = train_task(name, cache_path, output_dir, config)
+            print(f"✅ Trained {name}: {results[name]['metrics']}")
+        return results
+
+    # spawn: each worker imports numpy/TensorFlow fresh with the pinned thread counts
+    pin_threads(config['threads'])
+    context = mp.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(train_task, name, cache_path, output_dir, config): name
+            for name in task_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            print(f"✅ Trained {name}: {results[name]['metrics']}")
+    return results
+
+
+def write_bundle(bundle_dir, results, cache_path, config):
+    """Write the registry manifest and metrics next to the trained models"""
+    meta = load_feature_cache(cache_path)['meta']
+    shutil.copy(FEATURE_INFO_FILE, os.path.join(bundle_dir, 'feature_info.json'))
+
+    with open(os.path.join(bundle_dir, 'metrics.json'), 'w') as f:
+        json.dump({name: result['metrics'] for name, result in results.items()}, f, indent=2)
+
+    manifest = {
+        "version": os.path.basename(bundle_dir),
+        "created": datetime.now().isoformat(),
+        "feature_info_sha256": meta['feature_info_sha256'],
+        "feature_columns": meta['feature_columns'],
+        "cache_key": os.path.basename(cache_path),
+        "n_train": meta['n_train'],
+        "n_test": meta['n_test'],
+        "config": config,
+        "models": results,
+    }
+    with open(os.path.join(bundle_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    with open(os.path.join(REGISTRY_DIR, 'LATEST'), 'w') as f:
+        f.write(manifest['version'])
+    return manifest
+
+
+def publish_bundle(bundle_dir, results):
+    """Copy a bundle's models into trained_model/ where the API loads them from"""
+    os.makedirs(TRAINED_MODEL_DIR, exist_ok=True)
+    for result in results.values():
+        shutil.copy(os.path.join(bundle_dir, result['file']),
+                    os.path.join(TRAINED_MODEL_DIR, result['file']))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the FinBro attention models")
+    parser.add_argument('--data', default=DATA_FILE, help="Processed financial data CSV")
+    parser.add_argument('--models', nargs='+', choices=list(TASKS), default=list(TASKS))
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--learning-rate', type=float, default=0.001)
+    parser.add_argument('--n-heads', type=int, default=8)
+    parser.add_argument('--d-model', type=int, default=128)
+    parser.add_argument('--dropout-rate', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, default=len(TASKS), help="Models trained in parallel")
+    parser.add_argument('--threads', type=int, default=None, help="Threads per worker (default: cpus / workers)")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--publish', action='store_true', help="Copy the trained models into trained_model/")
+    parser.add_argument('--verbose', type=int, default=2)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workers = max(1, min(args.workers, len(args.models)))
+    config = {
+        "epochs": args.epochs,
+        "batch_size": args.batch_size,
+        "learning_rate": args.learning_rate,
+        "n_heads": args.n_heads,
+        "d_model": args.d_model,
+        "dropout_rate": args.dropout_rate,
+        "threads": args.threads or _default_threads(workers),
+        "seed": args.seed,
+        "verbose": args.verbose,
+    }
+
+    cache_path = prepare_cache(args.data)
+
+    version = datetime.now().strftime('%Y%m%d-%H%M%S') + '-' + os.path.basename(cache_path)[:8]
+    bundle_dir = os.path.join(REGISTRY_DIR, version)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    print(f"🚀 Training {', '.join(args.models)} with {workers} worker(s) x {config['threads']} thread(s)")
+    start = time.perf_counter()
+    results = run_training(args.models, cache_path, bundle_dir, config, workers)
+    print(f"Training finished in {time.perf_counter() - start:.1f}s")
+
+    write_bundle(bundle_dir, results, cache_path, config)
+    print(f"📦 Registry bundle written to {bundle_dir}")
+
+    if args.publish:
+        publish_bundle(bundle_dir, results)
+        print(f"Published models to {TRAINED_MODEL_DIR}")
+
+
+if __name__ == '__main__':
+    main()